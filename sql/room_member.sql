@@ -0,0 +1,10 @@
+-- Room membership: one row per employee per room.
+-- The primary key makes INSERT IGNORE idempotent and serves room -> members
+-- lookups; the secondary index serves employee -> rooms lookups and deletes.
+CREATE TABLE IF NOT EXISTS room_member (
+    room_id BIGINT UNSIGNED NOT NULL,
+    employee_id BIGINT UNSIGNED NOT NULL,
+    created TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (room_id, employee_id),
+    KEY idx_room_member_employee_id (employee_id)
+);
@@ -15,6 +15,7 @@ class BaseHandler(tornado.web.RequestHandler):
 
     Properties:
         db (Database): Provides access to the MySQL database instance.
+        membership (RoomMembership): Provides access to the room membership index.
         config (dict): Provides access to the application configuration settings.
 
     Methods:
@@ -33,6 +34,16 @@ class BaseHandler(tornado.web.RequestHandler):
         """
         return self.application.mysql
 
+    @property
+    def membership(self):
+        """
+        Provides access to the in-memory room membership index.
+
+        Returns:
+            RoomMembership: The membership index from the application.
+        """
+        return self.application.membership
+
     @property
     def config(self):
         """
@@ -13,6 +13,8 @@ from config import config
 
 # Import Custom Modules
 from utils.db import MySQL
+from utils.membership import RoomMembership
+from models.room_member import RoomMemberModel
 
 # Import custom handler modules.
 from handlers.chat import RootHandler
@@ -47,15 +49,35 @@ class Application(tornado.web.Application):
             'debug':True
         }
         self.mysql = MySQL()
+        # Load room memberships once so sends never query MySQL for them.
+        # A failed load is not caught: serving a partial index would deny real members.
+        self.membership = RoomMembership()
+        self.membership.load(RoomMemberModel().read_all())
         self.config = config
         super().__init__(handlers, **settings)
 
+    async def refresh_membership(self):
+        """
+        Reloads the room membership index to pick up changes made by other instances.
+        On failure the current index is kept and the error is reported.
+        """
+        try:
+            await self.membership.refresh()
+        except Exception as e:
+            print(f"Error refreshing room membership: {e}")
+
 
 if __name__ == '__main__':
     # Parse command-line options for the Tornado application.
     tornado.options.parse_command_line()
     # Create an HTTP server instance with the Tornado application.
-    HttpServer = tornado.httpserver.HTTPServer(Application(),xheaders=True)
+    App = Application()
+    HttpServer = tornado.httpserver.HTTPServer(App,xheaders=True)
+    # Periodically reload room memberships written by other instances.
+    tornado.ioloop.PeriodicCallback(
+        App.refresh_membership,
+        config['app']['membership']['refresh_interval'] * 1000
+    ).start()
     try:
         # Start listening for incoming requests on the specified port.
         HttpServer.listen(tornado.options.options.port)
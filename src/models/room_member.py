@@ -0,0 +1,179 @@
+"""
+Manage the execution of room membership data queries.
+The `room_member` table is defined in sql/room_member.sql.
+Ref: https://dev.mysql.com/doc/connector-python/en/connector-python-example-cursor-select.html
+"""
+
+# Import custom modules.
+from utils.db import MySQL
+
+
+class RoomMemberModel:
+    """
+    This model performs CRUD operations for room membership data.
+    """
+    _instance = None
+
+    # Number of rows fetched per round trip during bulk loads.
+    BATCH_SIZE = 10000
+
+    def __new__(cls):
+        """
+        Returns the instance of the class if class already initialized.
+        Otherwise initialize the class.
+        """
+        if cls._instance is None:
+            cls._instance = super(RoomMemberModel, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the room member model with MySQL database connection.
+        """
+        self.__mysql = MySQL()
+
+    def create(self, room_id, employee_id):
+        """
+        Adds an employee to a room in the database.
+
+        Errors are re-raised so a failed write cannot be mistaken for an
+        existing membership.
+
+        Returns:
+            bool: `True` if a row was inserted, `False` if it already existed.
+        """
+        connection = None
+        cursor = None
+        try:
+            connection = self.__mysql.get_connection()
+            cursor = connection.cursor()
+            cursor.execute("""INSERT IGNORE INTO room_member (room_id, employee_id)
+                              VALUES (%s, %s)""",
+                              (room_id, employee_id,))
+            connection.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            if connection:
+                connection.rollback()
+            print(f"Error creating room member: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    def read_all(self):
+        """
+        Retrives every (room_id, employee_id) pair from the database.
+
+        Rows are streamed in batches of `BATCH_SIZE` so that the whole
+        table is never materialised as a list of tuples at once. Errors
+        are not swallowed: a partial read must not be mistaken for the
+        full membership.
+        """
+        connection = None
+        cursor = None
+        try:
+            connection = self.__mysql.get_connection()
+            cursor = connection.cursor()
+            cursor.execute("""SELECT room_id, employee_id FROM room_member
+                              ORDER BY room_id, employee_id""")
+            while True:
+                rows = cursor.fetchmany(self.BATCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    def delete(self, room_id, employee_id):
+        """
+        Removes an employee from a room in the database.
+        Errors are re-raised so a failed write cannot be mistaken for a
+        missing membership.
+
+        Returns:
+            bool: `True` if a row was deleted, `False` if it did not exist.
+        """
+        connection = None
+        cursor = None
+        try:
+            connection = self.__mysql.get_connection()
+            cursor = connection.cursor()
+            cursor.execute("""DELETE FROM room_member
+                              WHERE room_id=%s AND employee_id=%s""",
+                              (room_id, employee_id,))
+            connection.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            if connection:
+                connection.rollback()
+            print(f"Error deleting room member: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    def delete_by_room(self, room_id):
+        """
+        Removes every member of a room from the database.
+        Errors are re-raised rather than reported as zero rows.
+
+        Returns:
+            int: The number of rows deleted.
+        """
+        connection = None
+        cursor = None
+        try:
+            connection = self.__mysql.get_connection()
+            cursor = connection.cursor()
+            cursor.execute("""DELETE FROM room_member
+                              WHERE room_id=%s""",
+                              (room_id,))
+            connection.commit()
+            return cursor.rowcount
+        except Exception as e:
+            if connection:
+                connection.rollback()
+            print(f"Error deleting room members: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    def delete_by_employee(self, employee_id):
+        """
+        Removes an employee from every room in the database.
+        Errors are re-raised rather than reported as zero rows.
+
+        Returns:
+            int: The number of rows deleted.
+        """
+        connection = None
+        cursor = None
+        try:
+            connection = self.__mysql.get_connection()
+            cursor = connection.cursor()
+            cursor.execute("""DELETE FROM room_member
+                              WHERE employee_id=%s""",
+                              (employee_id,))
+            connection.commit()
+            return cursor.rowcount
+        except Exception as e:
+            if connection:
+                connection.rollback()
+            print(f"Error deleting employee memberships: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
@@ -0,0 +1,440 @@
+"""
+In-memory room membership index.
+
+Membership is kept in both directions (room to members and employee to rooms)
+as sorted `array('Q')` integer ids, so every entry costs eight bytes whatever
+the size of the ids and lookups are binary searches. Fan-out, "rooms in
+common" and authorization checks therefore never touch MySQL on the hot path.
+
+Each service instance holds its own copy. Changes made through `join`,
+`leave`, `delete_room` and `delete_employee` write to MySQL and update the
+local index only when rows actually changed. Changes made by other instances
+(or rows that already existed) are picked up by `refresh`, which the
+application runs periodically. Local changes made while a refresh is reading
+are replayed on top of its snapshot, so they are never rolled back.
+"""
+
+# Import standard modules.
+import asyncio
+import operator
+from array import array
+from bisect import bisect_left
+from itertools import islice
+
+
+# Largest id an unsigned 64-bit array item can hold.
+_MAX_ID = (1 << 64) - 1
+
+# Ratio above which intersections binary search the larger side.
+_GALLOP_RATIO = 8
+
+
+def _check_id(value):
+    """
+    Validates that a room or employee id is a non-negative 64-bit integer.
+
+    Raises:
+        ValueError: If the id is not an integer or is out of range.
+    """
+    if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= _MAX_ID:
+        raise ValueError(f"Invalid id: {value!r}")
+
+
+def _contains(ids, value):
+    """
+    Checks whether a sorted array contains a value.
+    """
+    index = bisect_left(ids, value)
+    return index < len(ids) and ids[index] == value
+
+
+def _insert(index, key, value):
+    """
+    Inserts a value into the sorted array stored under a key.
+
+    Returns:
+        bool: `True` if the value was inserted, `False` if it was already present.
+    """
+    ids = index.get(key)
+    if ids is None:
+        index[key] = array('Q', (value,))
+        return True
+    position = bisect_left(ids, value)
+    if position < len(ids) and ids[position] == value:
+        return False
+    ids.insert(position, value)
+    return True
+
+
+def _remove(index, key, value):
+    """
+    Removes a value from the sorted array stored under a key,
+    dropping the key once its array is empty.
+
+    Returns:
+        bool: `True` if the value was removed, `False` if it was not present.
+    """
+    ids = index.get(key)
+    if ids is None:
+        return False
+    position = bisect_left(ids, value)
+    if position == len(ids) or ids[position] != value:
+        return False
+    del ids[position]
+    if not ids:
+        del index[key]
+    return True
+
+
+def _sorted_unique(ids):
+    """
+    Returns an array's values sorted and without duplicates.
+
+    Pairs read from MySQL arrive ordered by primary key, so the sort is linear
+    and the duplicate check finds nothing; only unordered input pays more.
+    """
+    ordered = sorted(ids)
+    if any(map(operator.eq, ordered, islice(ordered, 1, None))):
+        ordered = sorted(set(ordered))
+    return array('Q', ordered)
+
+
+def _build(pairs):
+    """
+    Builds both directions of the index from (room_id, employee_id) pairs.
+
+    Ids are appended straight into per-key arrays, which are then sorted in
+    place of the originals, so no per-key sets are kept.
+
+    Raises:
+        ValueError: If a pair contains an invalid id.
+
+    Returns:
+        tuple: The room to members and employee to rooms dictionaries,
+               and the number of distinct pairs.
+    """
+    room_members = {}
+    employee_rooms = {}
+    for room_id, employee_id in pairs:
+        _check_id(room_id)
+        _check_id(employee_id)
+        ids = room_members.get(room_id)
+        if ids is None:
+            room_members[room_id] = array('Q', (employee_id,))
+        else:
+            ids.append(employee_id)
+        ids = employee_rooms.get(employee_id)
+        if ids is None:
+            employee_rooms[employee_id] = array('Q', (room_id,))
+        else:
+            ids.append(room_id)
+    for index in (room_members, employee_rooms):
+        for key, ids in index.items():
+            index[key] = _sorted_unique(ids)
+    return room_members, employee_rooms, sum(len(ids) for ids in room_members.values())
+
+
+def _intersect(first, second):
+    """
+    Returns the sorted intersection of two sorted arrays.
+
+    When one side is much larger, the smaller side is binary searched into it;
+    otherwise a set intersection keeps the work in C.
+    """
+    if len(first) > len(second):
+        first, second = second, first
+    if not first:
+        return array('Q')
+    if len(second) > _GALLOP_RATIO * len(first):
+        return array('Q', (value for value in first if _contains(second, value)))
+    return array('Q', sorted(set(first).intersection(second)))
+
+
+class RoomMembership:
+    """
+    Keeps room membership in memory for fan-out targeting and authorization.
+    It contains the Singleton pattern so every handler shares one index.
+
+    Methods:
+        load: Rebuilds the index from (room_id, employee_id) pairs.
+        refresh: Reloads the index from MySQL without blocking the I/O loop.
+        join: Adds an employee to a room in MySQL and in the index.
+        leave: Removes an employee from a room in MySQL and in the index.
+        delete_room: Removes a room's memberships from MySQL and the index.
+        delete_employee: Removes an employee's memberships from MySQL and the index.
+        add: Adds an employee to a room in the index only.
+        discard: Removes an employee from a room in the index only.
+        drop_room: Removes a room and all of its memberships from the index only.
+        drop_employee: Removes an employee from every room in the index only.
+        is_member: Checks whether an employee belongs to a room.
+        members: Returns the employee ids of a room.
+        rooms: Returns the room ids of an employee.
+        recipients: Returns the employee ids a room message fans out to.
+        common_rooms: Returns the room ids shared by two employees.
+    """
+    _instance = None
+
+    def __new__(cls):
+        """
+        Returns the instance of the class if class already initialized.
+        Otherwise initialize the class.
+        """
+        if cls._instance is None:
+            cls._instance = super(RoomMembership, cls).__new__(cls)
+            cls._instance.model = None
+            cls._instance.__room_members = {}
+            cls._instance.__employee_rooms = {}
+            cls._instance.__journal = None
+        return cls._instance
+
+    def __get_model(self):
+        """
+        Returns the room member model, importing it on first use so the index
+        itself does not require a database connection.
+        """
+        if self.model is None:
+            # Import custom modules.
+            from models.room_member import RoomMemberModel
+            self.model = RoomMemberModel()
+        return self.model
+
+    def __record(self, change, *args):
+        """
+        Records a local change while a refresh is in progress,
+        so it can be replayed on the refreshed index.
+        """
+        if self.__journal is not None:
+            self.__journal.append((change, *args))
+
+    def load(self, pairs):
+        """
+        Rebuilds the index from an iterable of (room_id, employee_id) pairs,
+        typically `RoomMemberModel().read_all()`.
+
+        The new index is built aside and swapped in at the end, so if reading
+        the pairs fails the error propagates and the current index is kept.
+
+        Raises:
+            ValueError: If a pair contains an invalid id.
+
+        Returns:
+            int: The number of distinct membership pairs loaded.
+        """
+        self.__room_members, self.__employee_rooms, total = _build(pairs)
+        return total
+
+    async def refresh(self):
+        """
+        Reloads the index from MySQL to pick up changes made by other instances.
+
+        Rows are streamed and the new index is built on a worker thread; the
+        I/O loop only swaps it in. Local changes made in the meantime are
+        recorded and replayed on the new index, because the snapshot may
+        predate them.
+
+        Raises:
+            RuntimeError: If a refresh is already in progress.
+
+        Returns:
+            int: The number of distinct membership pairs loaded.
+        """
+        if self.__journal is not None:
+            raise RuntimeError("Room membership refresh already in progress.")
+        model = self.__get_model()
+        self.__journal = []
+        try:
+            room_members, employee_rooms, total = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: _build(model.read_all())
+            )
+            journal = self.__journal
+        finally:
+            self.__journal = None
+        self.__room_members = room_members
+        self.__employee_rooms = employee_rooms
+        for change, *args in journal:
+            change(*args)
+        return total
+
+    def join(self, room_id, employee_id):
+        """
+        Adds an employee to a room in MySQL and in the index.
+        Database errors propagate and leave the index unchanged.
+
+        Returns:
+            bool: `True` if the membership was created, `False` if it already existed.
+        """
+        _check_id(room_id)
+        _check_id(employee_id)
+        created = self.__get_model().create(room_id, employee_id)
+        if created:
+            self.add(room_id, employee_id)
+        return created
+
+    def leave(self, room_id, employee_id):
+        """
+        Removes an employee from a room in MySQL and in the index.
+        Database errors propagate and leave the index unchanged.
+
+        Returns:
+            bool: `True` if the membership was removed, `False` if it did not exist.
+        """
+        _check_id(room_id)
+        _check_id(employee_id)
+        deleted = self.__get_model().delete(room_id, employee_id)
+        if deleted:
+            self.discard(room_id, employee_id)
+        return deleted
+
+    def delete_room(self, room_id):
+        """
+        Removes every membership of a room from MySQL and from the index.
+        Database errors propagate and leave the index unchanged.
+
+        Returns:
+            int: The number of memberships removed from MySQL.
+        """
+        _check_id(room_id)
+        deleted = self.__get_model().delete_by_room(room_id)
+        if deleted:
+            self.drop_room(room_id)
+        return deleted
+
+    def delete_employee(self, employee_id):
+        """
+        Removes every membership of an employee from MySQL and from the index.
+        Database errors propagate and leave the index unchanged.
+
+        Returns:
+            int: The number of memberships removed from MySQL.
+        """
+        _check_id(employee_id)
+        deleted = self.__get_model().delete_by_employee(employee_id)
+        if deleted:
+            self.drop_employee(employee_id)
+        return deleted
+
+    def add(self, room_id, employee_id):
+        """
+        Adds an employee to a room in the index only.
+
+        Raises:
+            ValueError: If either id is invalid.
+
+        Returns:
+            bool: `True` if the membership was added, `False` if it already existed.
+        """
+        _check_id(room_id)
+        _check_id(employee_id)
+        self.__record(self.add, room_id, employee_id)
+        if not _insert(self.__room_members, room_id, employee_id):
+            return False
+        _insert(self.__employee_rooms, employee_id, room_id)
+        return True
+
+    def discard(self, room_id, employee_id):
+        """
+        Removes an employee from a room in the index only.
+
+        Raises:
+            ValueError: If either id is invalid.
+
+        Returns:
+            bool: `True` if the membership was removed, `False` if it did not exist.
+        """
+        _check_id(room_id)
+        _check_id(employee_id)
+        self.__record(self.discard, room_id, employee_id)
+        if not _remove(self.__room_members, room_id, employee_id):
+            return False
+        _remove(self.__employee_rooms, employee_id, room_id)
+        return True
+
+    def drop_room(self, room_id):
+        """
+        Removes a room and all of its memberships from the index only.
+
+        Returns:
+            int: The number of memberships removed.
+        """
+        self.__record(self.drop_room, room_id)
+        members = self.__room_members.pop(room_id, ())
+        for employee_id in members:
+            _remove(self.__employee_rooms, employee_id, room_id)
+        return len(members)
+
+    def drop_employee(self, employee_id):
+        """
+        Removes an employee from every room in the index only.
+
+        Returns:
+            int: The number of memberships removed.
+        """
+        self.__record(self.drop_employee, employee_id)
+        rooms = self.__employee_rooms.pop(employee_id, ())
+        for room_id in rooms:
+            _remove(self.__room_members, room_id, employee_id)
+        return len(rooms)
+
+    def is_member(self, room_id, employee_id):
+        """
+        Checks whether an employee belongs to a room, i.e. may post to it.
+        """
+        rooms = self.__employee_rooms.get(employee_id)
+        return rooms is not None and _contains(rooms, room_id)
+
+    def members(self, room_id):
+        """
+        Returns a copy of the employee ids of a room as a sorted array.
+        """
+        return array('Q', self.__room_members.get(room_id, ()))
+
+    def member_count(self, room_id):
+        """
+        Returns the number of employees in a room.
+        """
+        return len(self.__room_members.get(room_id, ()))
+
+    def rooms(self, employee_id):
+        """
+        Returns a copy of the room ids of an employee as a sorted array.
+        """
+        return array('Q', self.__employee_rooms.get(employee_id, ()))
+
+    def recipients(self, room_id, sender_id=None, online=None):
+        """
+        Returns the employee ids a message posted to a room fans out to.
+
+        Args:
+            room_id (int): The room the message is posted to.
+            sender_id (int, optional): Excluded from the recipients when given.
+            online (set, optional): Ids of connected employees; when given,
+                                    only those members are returned.
+
+        Returns:
+            array: The sorted recipient employee ids.
+        """
+        members = self.__room_members.get(room_id, ())
+        if online is None:
+            recipients = array('Q', members)
+        elif len(online) < len(members):
+            recipients = array('Q', sorted(
+                employee_id for employee_id in online if _contains(members, employee_id)
+            ))
+        else:
+            recipients = array('Q', (
+                employee_id for employee_id in members if employee_id in online
+            ))
+        if sender_id is not None:
+            position = bisect_left(recipients, sender_id)
+            if position < len(recipients) and recipients[position] == sender_id:
+                del recipients[position]
+        return recipients
+
+    def common_rooms(self, employee_id, other_id):
+        """
+        Returns the room ids two employees are both members of as a sorted array.
+        """
+        return _intersect(
+            self.__employee_rooms.get(employee_id, ()),
+            self.__employee_rooms.get(other_id, ()),
+        )
@@ -0,0 +1,10 @@
+"""
+Shared test configuration.
+"""
+
+# Import standard modules.
+import os
+import sys
+
+# The service imports its modules relative to src/, as when run from there.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
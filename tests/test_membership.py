@@ -0,0 +1,343 @@
+"""
+Tests for the in-memory room membership index.
+"""
+
+# Import standard modules.
+import asyncio
+import threading
+
+# Import community modules.
+import pytest
+
+# Import custom modules.
+from utils.membership import RoomMembership
+
+
+class FakeRoomMemberModel:
+    """
+    Stands in for RoomMemberModel with an in-memory set of rows.
+    """
+    def __init__(self, rows=()):
+        self.rows = set(rows)
+        self.error = None
+
+    def create(self, room_id, employee_id):
+        if self.error:
+            raise self.error
+        if (room_id, employee_id) in self.rows:
+            return False
+        self.rows.add((room_id, employee_id))
+        return True
+
+    def read_all(self):
+        yield from self.rows
+
+    def delete(self, room_id, employee_id):
+        if self.error:
+            raise self.error
+        if (room_id, employee_id) not in self.rows:
+            return False
+        self.rows.discard((room_id, employee_id))
+        return True
+
+    def delete_by_room(self, room_id):
+        if self.error:
+            raise self.error
+        deleted = {row for row in self.rows if row[0] == room_id}
+        self.rows -= deleted
+        return len(deleted)
+
+    def delete_by_employee(self, employee_id):
+        if self.error:
+            raise self.error
+        deleted = {row for row in self.rows if row[1] == employee_id}
+        self.rows -= deleted
+        return len(deleted)
+
+
+class SlowRoomMemberModel(FakeRoomMemberModel):
+    """
+    Snapshots its rows when read_all starts, then blocks until released.
+    """
+    def __init__(self, rows=()):
+        super().__init__(rows)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def read_all(self):
+        rows = sorted(self.rows)
+        self.started.set()
+        self.release.wait(5)
+        yield from rows
+
+
+@pytest.fixture
+def membership():
+    """
+    Returns the shared index, emptied and backed by a fake model.
+    """
+    index = RoomMembership()
+    index.load([])
+    index.model = FakeRoomMemberModel()
+    return index
+
+
+def assert_consistent(index, room_ids, employee_ids):
+    """
+    Asserts that both directions of the index describe the same pairs.
+    """
+    by_room = {(r, e) for r in room_ids for e in index.members(r)}
+    by_employee = {(r, e) for e in employee_ids for r in index.rooms(e)}
+    assert by_room == by_employee
+
+
+def test_singleton(membership):
+    assert RoomMembership() is membership
+
+
+def test_load_counts_distinct_pairs(membership):
+    assert membership.load([(1, 5), (1, 7), (2, 5), (1, 5)]) == 3
+    assert list(membership.members(1)) == [5, 7]
+    assert list(membership.rooms(5)) == [1, 2]
+
+
+def test_load_replaces_previous_index(membership):
+    membership.load([(1, 5)])
+    membership.load([(2, 6)])
+    assert not membership.is_member(1, 5)
+    assert membership.is_member(2, 6)
+
+
+def test_load_keeps_index_when_reading_fails(membership):
+    membership.load([(1, 5)])
+
+    def broken():
+        yield (2, 6)
+        raise RuntimeError('connection lost')
+
+    with pytest.raises(RuntimeError):
+        membership.load(broken())
+    assert membership.is_member(1, 5)
+    assert not membership.is_member(2, 6)
+
+
+def test_add_and_discard_return_values(membership):
+    assert membership.add(1, 5) is True
+    assert membership.add(1, 5) is False
+    assert membership.is_member(1, 5)
+    assert membership.discard(1, 5) is True
+    assert membership.discard(1, 5) is False
+    assert not membership.is_member(1, 5)
+    assert list(membership.rooms(5)) == []
+
+
+def test_members_returns_copy(membership):
+    membership.add(1, 5)
+    membership.members(1).append(9)
+    assert list(membership.members(1)) == [5]
+
+
+@pytest.mark.parametrize('value', [0, 7, 8, 63, 64, 65, (1 << 64) - 1])
+def test_boundary_ids(membership, value):
+    assert membership.add(value, value)
+    assert membership.add(1, value)
+    assert membership.is_member(value, value)
+    assert membership.is_member(1, value)
+    assert value in membership.members(1)
+    assert value in membership.rooms(value)
+    assert membership.discard(value, value)
+    assert not membership.is_member(value, value)
+
+
+def test_boundary_ids_stay_sorted(membership):
+    ids = [64, 0, 63, 8, 7, 65]
+    for value in ids:
+        membership.add(1, value)
+    assert list(membership.members(1)) == sorted(ids)
+    assert membership.member_count(1) == len(ids)
+
+
+@pytest.mark.parametrize('value', [-1, 1 << 64, 1.0, '1', None, True])
+def test_invalid_ids(membership, value):
+    with pytest.raises(ValueError):
+        membership.add(1, value)
+    with pytest.raises(ValueError):
+        membership.add(value, 1)
+    with pytest.raises(ValueError):
+        membership.discard(1, value)
+    with pytest.raises(ValueError):
+        membership.load([(1, value)])
+    assert list(membership.members(1)) == []
+
+
+def test_drop_room(membership):
+    membership.load([(1, 5), (1, 6), (2, 5)])
+    assert membership.drop_room(1) == 2
+    assert membership.drop_room(1) == 0
+    assert list(membership.members(1)) == []
+    assert list(membership.rooms(5)) == [2]
+    assert list(membership.rooms(6)) == []
+    assert_consistent(membership, [1, 2], [5, 6])
+
+
+def test_drop_employee(membership):
+    membership.load([(1, 5), (2, 5), (2, 6)])
+    assert membership.drop_employee(5) == 2
+    assert membership.drop_employee(5) == 0
+    assert list(membership.rooms(5)) == []
+    assert list(membership.members(1)) == []
+    assert list(membership.members(2)) == [6]
+    assert_consistent(membership, [1, 2], [5, 6])
+
+
+def test_recipients(membership):
+    membership.load([(1, 5), (1, 6), (1, 7), (1, 8)])
+    assert list(membership.recipients(1)) == [5, 6, 7, 8]
+    assert list(membership.recipients(1, sender_id=6)) == [5, 7, 8]
+    assert list(membership.recipients(1, sender_id=99)) == [5, 6, 7, 8]
+    assert list(membership.recipients(2, sender_id=5)) == []
+
+
+def test_recipients_online(membership):
+    membership.load([(1, 5), (1, 6), (1, 7), (1, 8)])
+    # Fewer online employees than members.
+    assert list(membership.recipients(1, online={8, 6, 42})) == [6, 8]
+    # More online employees than members.
+    online = set(range(5, 100, 2))
+    assert list(membership.recipients(1, online=online)) == [5, 7]
+    assert list(membership.recipients(1, sender_id=5, online=online)) == [7]
+    assert list(membership.recipients(1, online=set())) == []
+
+
+def test_large_ids_are_compact(membership):
+    membership.add(5_000_000, 10_000_000)
+    membership.add(5_000_000, 10_000_001)
+    assert list(membership.recipients(5_000_000, sender_id=10_000_000)) == [10_000_001]
+    assert membership.rooms(10_000_000).buffer_info()[1] == 1
+
+
+def test_common_rooms(membership):
+    membership.load([(1, 5), (2, 5), (3, 5), (2, 6), (3, 6), (4, 6)])
+    assert list(membership.common_rooms(5, 6)) == [2, 3]
+    assert list(membership.common_rooms(5, 7)) == []
+    assert list(membership.common_rooms(5, 5)) == [1, 2, 3]
+
+
+def test_common_rooms_unbalanced(membership):
+    for room_id in range(100):
+        membership.add(room_id, 5)
+    membership.add(42, 6)
+    membership.add(1000, 6)
+    assert list(membership.common_rooms(5, 6)) == [42]
+    assert list(membership.common_rooms(6, 5)) == [42]
+
+
+def test_join_and_leave_follow_database(membership):
+    assert membership.join(1, 5) is True
+    assert membership.is_member(1, 5)
+    assert membership.join(1, 5) is False
+    assert membership.leave(1, 5) is True
+    assert not membership.is_member(1, 5)
+    assert membership.leave(1, 5) is False
+    assert membership.model.rows == set()
+
+
+def test_join_skips_index_when_database_unchanged(membership):
+    membership.model.rows.add((1, 5))
+    assert membership.join(1, 5) is False
+    assert not membership.is_member(1, 5)
+
+
+def test_delete_room_and_employee_follow_database(membership):
+    for pair in [(1, 5), (1, 6), (2, 5)]:
+        membership.join(*pair)
+    assert membership.delete_room(1) == 2
+    assert list(membership.members(1)) == []
+    assert list(membership.rooms(5)) == [2]
+    assert membership.delete_employee(5) == 1
+    assert list(membership.rooms(5)) == []
+    assert membership.model.rows == set()
+
+
+def test_refresh_picks_up_external_changes(membership):
+    membership.join(1, 5)
+    membership.model.rows.add((2, 6))
+    membership.model.rows.discard((1, 5))
+    assert asyncio.run(membership.refresh()) == 1
+    assert membership.is_member(2, 6)
+    assert not membership.is_member(1, 5)
+
+
+def test_join_and_leave_propagate_database_errors(membership):
+    membership.join(1, 5)
+    membership.model.error = RuntimeError('connection lost')
+    with pytest.raises(RuntimeError):
+        membership.join(2, 5)
+    with pytest.raises(RuntimeError):
+        membership.leave(1, 5)
+    with pytest.raises(RuntimeError):
+        membership.delete_room(1)
+    with pytest.raises(RuntimeError):
+        membership.delete_employee(5)
+    assert membership.is_member(1, 5)
+    assert not membership.is_member(2, 5)
+
+
+def test_load_deduplicates_unordered_pairs(membership):
+    assert membership.load([(2, 9), (1, 7), (2, 3), (1, 7), (2, 9)]) == 3
+    assert list(membership.members(2)) == [3, 9]
+    assert list(membership.rooms(9)) == [2]
+
+
+def test_refresh_keeps_changes_made_while_reading(membership):
+    membership.model = SlowRoomMemberModel()
+    for pair in [(1, 5), (3, 7), (3, 8)]:
+        membership.join(*pair)
+
+    async def scenario():
+        refresh = asyncio.ensure_future(membership.refresh())
+        await asyncio.get_running_loop().run_in_executor(None, membership.model.started.wait, 5)
+        assert membership.leave(1, 5) is True
+        assert membership.join(2, 6) is True
+        assert membership.delete_room(3) == 2
+        membership.model.release.set()
+        return await refresh
+
+    assert asyncio.run(scenario()) == 3
+    assert not membership.is_member(1, 5)
+    assert membership.is_member(2, 6)
+    assert list(membership.members(3)) == []
+    assert list(membership.rooms(7)) == []
+    assert_consistent(membership, [1, 2, 3], [5, 6, 7, 8])
+
+
+def test_refresh_failure_keeps_index(membership):
+    membership.join(1, 5)
+
+    def broken():
+        raise RuntimeError('connection lost')
+        yield
+
+    membership.model.read_all = broken
+    with pytest.raises(RuntimeError):
+        asyncio.run(membership.refresh())
+    assert membership.is_member(1, 5)
+    # Changes are no longer journaled once the refresh has ended.
+    membership.model = FakeRoomMemberModel(membership.model.rows)
+    assert asyncio.run(membership.refresh()) == 1
+
+
+def test_refresh_rejects_concurrent_refresh(membership):
+    membership.model = SlowRoomMemberModel()
+
+    async def scenario():
+        refresh = asyncio.ensure_future(membership.refresh())
+        await asyncio.get_running_loop().run_in_executor(None, membership.model.started.wait, 5)
+        try:
+            with pytest.raises(RuntimeError):
+                await membership.refresh()
+        finally:
+            membership.model.release.set()
+        return await refresh
+
+    assert asyncio.run(scenario()) == 0